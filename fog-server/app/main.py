@@ -10,20 +10,26 @@ Fog-сервер для IoT-системы мониторинга GPU-класт
 - Алерты при критичных температурах
 """
 
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Header, HTTPException, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timezone, timedelta
 from contextlib import asynccontextmanager
 import asyncio
+import math
+import orjson
 import os
+import zlib
+from collections import defaultdict
 import time
 from enum import Enum
 from dotenv import load_dotenv
 
 # InfluxDB
-from influxdb_client import InfluxDBClient, Point
+from influxdb_client import InfluxDBClient, Point, WritePrecision
 from influxdb_client.client.write_api import SYNCHRONOUS
 
 # Загружаем переменные окружения
@@ -169,38 +175,38 @@ class InfluxDBManager:
         - measurement: gpu_temps (температуры и нагрузка GPU)
         - measurement: room_temp (температура помещения)
         - measurement: fan_states (состояния вентиляторов)
+        
+        Пакет собирается сразу в line protocol, без промежуточных объектов Point
         """
-        points = []
+        device_id = _escape_tag(payload.device_id)
+        ts = _iso_to_unix_ns(payload.timestamp)
         
-        # Температуры GPU
+        # Температуры GPU (нечисловые NaN/inf поля пропускаются, как у Point;
+        # точка без полей не пишется — иначе InfluxDB отклонит весь батч)
+        lines = []
         for gpu_temp in payload.sensors.gpu_temps:
-            point = Point("gpu_temps") \
-                .tag("device_id", payload.device_id) \
-                .tag("gpu_id", str(gpu_temp.gpu_id)) \
-                .field("temperature", gpu_temp.temperature) \
-                .field("load", gpu_temp.load) \
-                .time(payload.timestamp)
-            points.append(point)
+            fields = _float_fields(temperature=gpu_temp.temperature, load=gpu_temp.load)
+            if fields:
+                lines.append(f"gpu_temps,device_id={device_id},gpu_id={gpu_temp.gpu_id} {fields} {ts}")
         
         # Температура помещения
-        point = Point("room_temp") \
-            .tag("device_id", payload.device_id) \
-            .field("temperature", payload.sensors.room_temp) \
-            .time(payload.timestamp)
-        points.append(point)
-        
-        # Состояния вентиляторов
-        for fan in payload.fans.fan_states:
-            point = Point("fan_states") \
-                .tag("device_id", payload.device_id) \
-                .tag("fan_id", str(fan.fan_id)) \
-                .field("rpm", fan.rpm) \
-                .field("pwm_duty", fan.pwm_duty) \
-                .time(payload.timestamp)
-            points.append(point)
+        fields = _float_fields(temperature=payload.sensors.room_temp)
+        if fields:
+            lines.append(f"room_temp,device_id={device_id} {fields} {ts}")
+        
+        # Состояния вентиляторов (целочисленные поля — суффикс i, как у Point)
+        lines.extend(
+            f"fan_states,device_id={device_id},fan_id={fan.fan_id} "
+            f"rpm={fan.rpm}i,pwm_duty={fan.pwm_duty}i {ts}"
+            for fan in payload.fans.fan_states
+        )
         
         # Записываем все точки одним батчем
-        self.write_api.write(bucket=config.INFLUXDB_BUCKET, record=points)
+        self.write_api.write(
+            bucket=config.INFLUXDB_BUCKET,
+            record="\n".join(lines),
+            write_precision=WritePrecision.NS
+        )
     
     def write_alert(self, alert: AlertEvent):
         """Сохранение алерта"""
@@ -272,6 +278,46 @@ class InfluxDBManager:
         
         return data
 
+# Таблица экранирования ключей и значений тегов — та же, что у Point
+# в influxdb_client: перевод строки внутри тега иначе разбил бы запись
+# на несколько строк line protocol
+_ESCAPE_TAG = str.maketrans({
+    ',': r'\,',
+    '=': r'\=',
+    ' ': r'\ ',
+    '\n': r'\n',
+    '\t': r'\t',
+    '\r': r'\r',
+})
+
+def _escape_tag(value: str) -> str:
+    """Экранирует значение тега для line protocol (как Point в influxdb_client)"""
+    escaped = value.translate(_ESCAPE_TAG)
+    # Завершающий обратный слэш экранировал бы разделитель после тега
+    if escaped.endswith("\\"):
+        escaped += " "
+    return escaped
+
+def _float_fields(**fields: float) -> str:
+    """
+    Поля с плавающей точкой для line protocol: "name=value,..."
+    
+    NaN и ±inf пропускаются (как у Point): InfluxDB их не принимает
+    и отклонил бы весь батч
+    """
+    return ",".join(
+        f"{name}={value!r}" for name, value in fields.items() if math.isfinite(value)
+    )
+
+_UNIX_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+def _iso_to_unix_ns(timestamp: str) -> int:
+    """ISO 8601 timestamp → наносекунды Unix (без часового пояса считаем UTC)"""
+    dt = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return (dt - _UNIX_EPOCH) // timedelta(microseconds=1) * 1000
+
 influx_manager = InfluxDBManager()
 
 # ============================================================================
@@ -519,7 +565,8 @@ app = FastAPI(
     title="GPU Cooling Fog Server",
     description="IoT система мониторинга и адаптивного управления охлаждением GPU-кластера",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse  # orjson быстрее stdlib json на больших массивах float
 )
 
 # CORS для веб-интерфейса
@@ -531,6 +578,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Сжатие ответов: история и статистика за сутки — сотни КБ JSON,
+# мелкие ответы (<1 КиБ) отдаём как есть
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # ============================================================================
 # API ENDPOINTS
 # ============================================================================
@@ -561,12 +612,10 @@ async def receive_telemetry(payload: TelemetryPayload):
             influx_manager.write_alert(alert)
         
         # 3. Вычисляем команды в зависимости от режима
-        global pending_commands
-        
         if system_mode["mode"] == "auto":
             # АВТОМАТИЧЕСКИЙ РЕЖИМ: алгоритм управляет
             fan_commands = cooling_algo.calculate_fan_commands(payload)
-            pending_commands[payload.device_id] = fan_commands
+            queue_fan_commands(fan_commands)
             
         elif system_mode["mode"] == "manual":
             # РУЧНОЙ РЕЖИМ: используем команды пользователя
@@ -579,7 +628,7 @@ async def receive_telemetry(payload: TelemetryPayload):
                         for cmd in manual_batch.commands
                     ]
                 )
-                pending_commands[payload.device_id] = fan_commands
+                queue_fan_commands(fan_commands)
         
         print(f"✓ Телеметрия получена от {payload.device_id} (режим: {system_mode['mode']})")
         
@@ -594,8 +643,29 @@ async def receive_telemetry(payload: TelemetryPayload):
         print(f"✗ Ошибка обработки телеметрии: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-# Хранилище команд для ESP32
-pending_commands: Dict[str, FanControlBatch] = {}
+@app.post("/api/v1/tick")
+async def telemetry_tick(payload: TelemetryPayload):
+    """
+    Объединённый цикл ESP32: телеметрия + команды за один запрос
+    
+    Обрабатывает телеметрию как /api/v1/telemetry и сразу возвращает
+    накопленные команды в поле "commands" (null если команд нет),
+    избавляя ESP32 от отдельного опроса /api/v1/fan-control/{device_id}
+    """
+    result = await receive_telemetry(payload)
+    
+    commands = pending_commands.pop(payload.device_id, None)
+    result["commands"] = orjson.Fragment(commands) if commands is not None else None
+    
+    return ORJSONResponse(content=result)
+
+# Хранилище команд для ESP32: {device_id: JSON FanControlBatch}
+# Команды сериализуются один раз при записи, а не на каждом опросе ESP32
+pending_commands: Dict[str, bytes] = {}
+
+def queue_fan_commands(fan_commands: FanControlBatch):
+    """Ставит команды в очередь для ESP32 (заменяет предыдущие)"""
+    pending_commands[fan_commands.device_id] = fan_commands.model_dump_json().encode()
 
 # ============================================================================
 # УПРАВЛЕНИЕ РЕЖИМОМ РАБОТЫ
@@ -628,19 +698,25 @@ def log_user_action(action: str, details: dict):
     print(f"👤 Действие пользователя: {action} - {details}")
 
 @app.get("/api/v1/fan-control/{device_id}")
-async def get_fan_commands(device_id: str):
+async def get_fan_commands(device_id: str, if_none_match: Optional[str] = Header(None)):
     """
     ESP32 получает команды управления вентиляторами
     
     Returns:
         FanControlBatch если есть команды
+        304 Not Modified если команды совпадают с уже полученными (If-None-Match)
         204 No Content если команд нет
     """
-    if device_id in pending_commands:
-        commands = pending_commands.pop(device_id)  # Забираем и удаляем
-        return commands
-    else:
-        return None  # FastAPI вернёт 204
+    commands = pending_commands.pop(device_id, None)  # Забираем и удаляем
+    if commands is None:
+        return Response(status_code=204)
+    
+    # ETag по содержимому: повторно выставленный тот же набор команд
+    # ESP32 возьмёт из своего кэша без передачи и разбора тела
+    etag = f'"{zlib.crc32(commands):08x}"'
+    if if_none_match == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=commands, media_type="application/json", headers={"ETag": etag})
 
 @app.get("/api/v1/current-state")
 async def get_current_state():
@@ -668,7 +744,8 @@ async def get_history(hours: int = 1):
     """API для веб-интерфейса: исторические данные"""
     try:
         data = influx_manager.query_history(hours)
-        return {"data": data}
+        # Данные уже JSON-совместимы — отдаём напрямую, минуя jsonable_encoder
+        return ORJSONResponse(content={"data": data})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -698,7 +775,7 @@ async def get_fan_history(hours: int = 1):
                     "value": record.values.get("_value")
                 })
         
-        return {"data": data}
+        return ORJSONResponse(content={"data": data})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 # ============================================================================
@@ -772,7 +849,6 @@ async def set_manual_fan_control(control_batch: FanManualControlBatch):
         print(f"   Вентилятор {cmd.fan_id}: PWM установлен на {cmd.pwm_duty}%")
     
     # Отправляем команды в очередь для ESP32
-    global pending_commands
     fan_commands = FanControlBatch(
         device_id=control_batch.device_id,
         commands=[
@@ -780,7 +856,7 @@ async def set_manual_fan_control(control_batch: FanManualControlBatch):
             for cmd in control_batch.commands
         ]
     )
-    pending_commands[control_batch.device_id] = fan_commands
+    queue_fan_commands(fan_commands)
     
     return {
         "status": "success",
@@ -806,21 +882,17 @@ async def get_fan_statistics():
         result = influx_manager.query_api.query(query=query)
         
         # Группируем данные по fan_id
-        fan_data = {}
+        fan_data: Dict[int, List[int]] = defaultdict(list)
         for table in result:
             for record in table.records:
-                fan_id = int(record.values.get("fan_id"))
-                pwm = record.values.get("_value")
-                
-                if fan_id not in fan_data:
-                    fan_data[fan_id] = []
-                fan_data[fan_id].append(pwm)
+                values = record.values
+                fan_data[int(values["fan_id"])].append(values["_value"])
         
         # Вычисляем статистику
         statistics = []
         for fan_id in range(1, config.GPU_COUNT + 1):
-            if fan_id in fan_data and fan_data[fan_id]:
-                pwm_values = fan_data[fan_id]
+            pwm_values = fan_data.get(fan_id)
+            if pwm_values:
                 
                 avg_pwm = sum(pwm_values) / len(pwm_values)
                 max_pwm = max(pwm_values)
@@ -3,7 +3,8 @@
 Эмулирует MOSFET управление 4-pin PWM вентиляторами
 """
 
-from typing import Dict, List
+from typing import List
+import numpy as np
 from models import FanState
 
 
@@ -14,16 +15,15 @@ class FanController:
         self.fan_count = fan_count
         self.config = config
         
-        # Текущее состояние каждого вентилятора
-        # Словарь: {fan_id: {"pwm": 0-100, "rpm": 800-5000}}
-        self.fans: Dict[int, Dict[str, int]] = {}
+        # Диапазон оборотов из конфига (читаем один раз, а не на каждый расчёт RPM)
+        self._rpm_min = int(config['fans']['rpm_min'])
+        self._rpm_range = int(config['fans']['rpm_max']) - self._rpm_min
         
-        # Инициализация: все вентиляторы на минимальных оборотах
-        for fan_id in range(1, fan_count + 1):
-            self.fans[fan_id] = {
-                "pwm": 20,  # 20% PWM = минимальные обороты
-                "rpm": self._calculate_rpm(20)
-            }
+        # Текущее состояние вентиляторов — два массива подряд по fan_id
+        # (индекс = fan_id - 1): PWM 0-100% и RPM 800-5000
+        # Инициализация: все вентиляторы на 20% PWM = минимальные обороты
+        self.pwm_array = np.full(fan_count, 20, dtype=np.int64)
+        self.rpm_array = self._calculate_rpms(self.pwm_array)
     
     def _calculate_rpm(self, pwm_duty: int) -> int:
         """
@@ -40,17 +40,27 @@ class FanController:
         - 100% PWM → максимум (5000 RPM)
         - Линейная зависимость между ними
         """
-        rpm_min = self.config['fans']['rpm_min']
-        rpm_max = self.config['fans']['rpm_max']
-        
         if pwm_duty <= 0:
-            return rpm_min
+            return self._rpm_min
+        
+        # Линейная интерполяция (целочисленная: без float-деления и int())
+        return self._rpm_min + self._rpm_range * pwm_duty // 100
+    
+    def _calculate_rpms(self, pwm_duties: np.ndarray) -> np.ndarray:
+        """
+        Векторный вариант _calculate_rpm для массива PWM
         
-        # Линейная интерполяция
-        rpm_range = rpm_max - rpm_min
-        rpm = rpm_min + (rpm_range * pwm_duty / 100.0)
+        Args:
+            pwm_duties: Массив PWM в процентах (0-100)
         
-        return int(rpm)
+        Returns:
+            Массив RPM той же длины
+        """
+        return np.where(
+            pwm_duties <= 0,
+            self._rpm_min,
+            self._rpm_min + self._rpm_range * pwm_duties // 100
+        )
     
     def set_fan_pwm(self, fan_id: int, pwm_duty: int):
         """
@@ -61,14 +71,61 @@ class FanController:
             fan_id: ID вентилятора (1-8)
             pwm_duty: Желаемый PWM (0-100%)
         """
-        if fan_id not in self.fans:
+        if not 1 <= fan_id <= self.fan_count:
             raise ValueError(f"Fan ID {fan_id} не существует")
+        index = fan_id - 1
+        
+        # Ограничиваем PWM диапазоном 0-100 (без вызовов max/min)
+        pwm_duty = 0 if pwm_duty < 0 else 100 if pwm_duty > 100 else pwm_duty
+        
+        # Тот же PWM (обычный случай в установившемся режиме) — RPM не меняются
+        if self.pwm_array[index] == pwm_duty:
+            return
+        
+        self.pwm_array[index] = pwm_duty
+        self.rpm_array[index] = self._calculate_rpm(pwm_duty)
+    
+    def validate_fan_ids(self, fan_ids: np.ndarray) -> np.ndarray:
+        """
+        Проверяет, что все ID вентиляторов существуют (1..fan_count)
+        
+        Args:
+            fan_ids: ID вентиляторов
+        
+        Returns:
+            fan_ids в виде массива int64
+        
+        Raises:
+            ValueError: Если хотя бы одного вентилятора нет
+        """
+        fan_ids = np.asarray(fan_ids, dtype=np.int64)
+        unknown = (fan_ids < 1) | (fan_ids > self.fan_count)
+        if unknown.any():
+            raise ValueError(f"Fan ID {int(fan_ids[unknown][0])} не существует")
+        return fan_ids
+    
+    def set_fan_pwm_batch(self, fan_ids: np.ndarray, pwm_duties: np.ndarray) -> np.ndarray:
+        """
+        Устанавливает PWM для нескольких вентиляторов за один вызов
+        
+        Args:
+            fan_ids: ID вентиляторов
+            pwm_duties: Желаемый PWM для каждого (0-100%)
+        
+        Returns:
+            Новые RPM вентиляторов (в порядке fan_ids)
+        """
+        fan_ids = self.validate_fan_ids(fan_ids)
         
         # Ограничиваем PWM диапазоном 0-100
-        pwm_duty = max(0, min(100, pwm_duty))
+        pwm_duties = np.clip(np.asarray(pwm_duties, dtype=np.int64), 0, 100)
+        
+        rpms = self._calculate_rpms(pwm_duties)
         
-        self.fans[fan_id]["pwm"] = pwm_duty
-        self.fans[fan_id]["rpm"] = self._calculate_rpm(pwm_duty)
+        self.pwm_array[fan_ids - 1] = pwm_duties
+        self.rpm_array[fan_ids - 1] = rpms
+        
+        return rpms
     
     def get_fan_cooling_effect(self, fan_id: int) -> float:
         """
@@ -79,22 +136,31 @@ class FanController:
             0.0 = нет охлаждения
             1.0 = максимальное охлаждение
         """
-        pwm = self.fans[fan_id]["pwm"]
-        return pwm / 100.0
+        return int(self.pwm_array[fan_id - 1]) / 100.0
+    
+    def get_cooling_effects(self) -> np.ndarray:
+        """
+        Эффект охлаждения всех вентиляторов (0.0-1.0) одним массивом
+        
+        Returns:
+            Массив по fan_id (индекс = fan_id - 1)
+        """
+        return self.pwm_array / 100.0
     
     def get_all_fan_states(self) -> List[FanState]:
         """
         Возвращает состояния всех вентиляторов
         Формат для отправки в телеметрии на fog-сервер
         """
-        fan_states = []
-        for fan_id in sorted(self.fans.keys()):
-            fan_states.append(FanState(
-                fan_id=fan_id,
-                rpm=self.fans[fan_id]["rpm"],
-                pwm_duty=self.fans[fan_id]["pwm"]
-            ))
-        return fan_states
+        # Массивы уже упорядочены по fan_id — без сортировки и обхода словарей
+        return [
+            FanState(fan_id=fan_id, rpm=rpm, pwm_duty=pwm)
+            for fan_id, rpm, pwm in zip(
+                range(1, self.fan_count + 1),
+                self.rpm_array.tolist(),
+                self.pwm_array.tolist()
+            )
+        ]
     
     def apply_command_batch(self, commands: List[dict]):
         """
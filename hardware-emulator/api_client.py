@@ -4,9 +4,12 @@ HTTP-клиент для отправки данных на fog-сервер
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
-from typing import Optional, Dict, Any
-from models import TelemetryPayload, FanControlBatch
+import random
+from typing import Optional, Dict, Any, Tuple
+from models import TelemetryPayload, FanControlBatch, TickResponse
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +17,13 @@ logger = logging.getLogger(__name__)
 class FogServerClient:
     """Клиент для взаимодействия с fog-сервером"""
     
+    __slots__ = ('base_url', 'timeout', 'session',
+                 '_backoff', '_max_backoff', '_delay_factor', '_etag_cache')
+    
+    # Общие сессии (пулы TCP-соединений) по base_url: несколько клиентов
+    # одного fog-сервера не открывают каждый свой пул
+    _SESSION_POOL: Dict[str, requests.Session] = {}
+    
     def __init__(self, base_url: str, timeout: int = 10):
         """
         Args:
@@ -22,13 +32,53 @@ class FogServerClient:
         """
         self.base_url = base_url.rstrip('/')  # Убираем trailing slash
         self.timeout = timeout
-        self.session = requests.Session()  # Переиспользуем TCP-соединение
+        self.session = self._get_session(self.base_url)  # Переиспользуем TCP-соединения
+        
+        # Экспоненциальный backoff при недоступности сервера:
+        # множитель интервала отправки удваивается после каждой ошибки
+        self._backoff = 1.0
+        self._max_backoff = 8.0
+        self._delay_factor = 1.0  # backoff с jitter, фиксируется в момент ошибки
+        
+        # Последние полученные команды: {endpoint: (ETag, FanControlBatch)}
+        self._etag_cache: Dict[str, Tuple[str, FanControlBatch]] = {}
+    
+    @classmethod
+    def _get_session(cls, base_url: str) -> requests.Session:
+        """
+        Возвращает общую сессию для fog-сервера (создаётся один раз)
         
-        # Headers как у настоящего ESP32
-        self.session.headers.update({
-            'Content-Type': 'application/json',
-            'User-Agent': 'ESP32-HTTPClient/1.0'
-        })
+        Args:
+            base_url: URL fog-сервера
+        
+        Returns:
+            requests.Session с пулом соединений
+        """
+        session = cls._SESSION_POOL.get(base_url)
+        if session is None:
+            session = requests.Session()
+            
+            # Keep-alive пул + быстрый повтор, если сервер закрыл
+            # простаивающее соединение (без нового цикла backoff).
+            # POST повторяется только при ошибке соединения, до отправки
+            # тела: /tick не идемпотентен (забирает ожидающие команды,
+            # пишет алерты, двигает состояние алгоритма охлаждения),
+            # поэтому после потерянного ответа запрос не повторяем
+            adapter = HTTPAdapter(
+                pool_connections=16,
+                pool_maxsize=64,
+                max_retries=Retry(total=2, backoff_factor=0.1)
+            )
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            
+            # Headers как у настоящего ESP32
+            session.headers.update({
+                'Content-Type': 'application/json',
+                'User-Agent': 'ESP32-HTTPClient/1.0'
+            })
+            cls._SESSION_POOL[base_url] = session
+        return session
     
     def send_telemetry(self, payload: TelemetryPayload) -> bool:
         """
@@ -41,40 +91,112 @@ class FogServerClient:
             True если успешно, False если ошибка
         """
         endpoint = f"{self.base_url}/api/v1/telemetry"
+        return self._post_telemetry(endpoint, payload) is not None
+    
+    def send_tick(self, payload: TelemetryPayload) -> Tuple[bool, Optional[FanControlBatch]]:
+        """
+        Отправляет телеметрию и получает команды одним запросом
+        
+        Args:
+            payload: Данные температуры и вентиляторов
+        
+        Returns:
+            (успех отправки, FanControlBatch или None если команд нет)
+        
+        Логика:
+        Fog-сервер возвращает накопленные команды прямо в ответе на телеметрию,
+        поэтому отдельный опрос fetch_fan_commands на каждом цикле не нужен.
+        """
+        endpoint = f"{self.base_url}/api/v1/tick"
+        response = self._post_telemetry(endpoint, payload)
+        
+        if response is None:
+            return False, None
         
         try:
-            # Конвертируем Pydantic модель в JSON
-            json_data = payload.model_dump()
+            # Парсим и валидируем ответ за один проход в pydantic-core,
+            # без промежуточного dict из response.json()
+            commands = TickResponse.model_validate_json(response.content).commands
+            if not commands:
+                return True, None
             
-            logger.debug(f"Отправка телеметрии на {endpoint}")
+            logger.info("✓ Получены команды для %d вентиляторов", len(commands.commands))
+            return True, commands
+            
+        except Exception as e:
+            logger.warning("Ошибка разбора команд из ответа: %s", e)
+            return True, None
+    
+    def _post_telemetry(self, endpoint: str, payload: TelemetryPayload) -> Optional[requests.Response]:
+        """
+        POST телеметрии с общей обработкой ошибок
+        
+        Returns:
+            Ответ сервера или None если ошибка
+        """
+        try:
+            # Сериализуем Pydantic модель сразу в JSON-байты (один проход в pydantic-core,
+            # без промежуточного dict и повторного json.dumps внутри requests)
+            body = payload.model_dump_json().encode()
+            
+            logger.debug("Отправка телеметрии на %s", endpoint)
             
             response = self.session.post(
                 endpoint,
-                json=json_data,
+                data=body,
                 timeout=self.timeout
             )
             
             # Проверяем статус ответа
             response.raise_for_status()  # Выбросит ошибку если статус 4xx или 5xx
             
-            logger.info(f"✓ Телеметрия отправлена успешно (статус {response.status_code})")
-            return True
+            logger.info("✓ Телеметрия отправлена успешно (статус %d)", response.status_code)
+            self._reset_backoff()
+            return response
             
         except requests.exceptions.ConnectionError:
-            logger.error(f"✗ Не удалось подключиться к fog-серверу {endpoint}")
-            return False
+            logger.error("✗ Не удалось подключиться к fog-серверу %s", endpoint)
+            self._increase_backoff()
+            return None
             
         except requests.exceptions.Timeout:
-            logger.error(f"✗ Таймаут при отправке на {endpoint}")
-            return False
+            logger.error("✗ Таймаут при отправке на %s", endpoint)
+            self._increase_backoff()
+            return None
             
         except requests.exceptions.HTTPError as e:
-            logger.error(f"✗ HTTP ошибка: {e.response.status_code} - {e.response.text}")
-            return False
+            logger.error("✗ HTTP ошибка: %d - %s", e.response.status_code, e.response.text)
+            self._increase_backoff()
+            return None
             
         except Exception as e:
-            logger.error(f"✗ Неожиданная ошибка при отправке: {e}")
-            return False
+            logger.error("✗ Неожиданная ошибка при отправке: %s", e)
+            self._increase_backoff()
+            return None
+    
+    def next_poll_delay(self, base_interval: float) -> float:
+        """
+        Интервал до следующей отправки с учётом backoff
+        
+        Args:
+            base_interval: Штатный интервал отправки (секунды)
+        
+        Returns:
+            base_interval пока сервер отвечает; после ошибок — увеличенный
+            в 2, 4, 8 раз интервал с jitter ±20%, чтобы множество ESP32
+            не переподключались к серверу одновременно
+        """
+        return base_interval * self._delay_factor
+    
+    def _increase_backoff(self):
+        """Удваивает множитель интервала после неудачной отправки"""
+        self._backoff = min(self._max_backoff, self._backoff * 2)
+        self._delay_factor = self._backoff * random.uniform(0.8, 1.2)
+    
+    def _reset_backoff(self):
+        """Возвращает штатный интервал после успешной отправки"""
+        self._backoff = 1.0
+        self._delay_factor = 1.0
     
     def fetch_fan_commands(self, device_id: str) -> Optional[FanControlBatch]:
         """
@@ -92,26 +214,36 @@ class FogServerClient:
         """
         endpoint = f"{self.base_url}/api/v1/fan-control/{device_id}"
         
+        cached = self._etag_cache.get(endpoint)
+        headers = {'If-None-Match': cached[0]} if cached else None
+        
         try:
-            response = self.session.get(endpoint, timeout=self.timeout)
+            response = self.session.get(endpoint, headers=headers, timeout=self.timeout)
             
             if response.status_code == 204:
                 # 204 No Content = команд нет
                 return None
             
+            if response.status_code == 304:
+                # 304 Not Modified = те же команды, что и в прошлый раз
+                return cached[1]
+            
             response.raise_for_status()
             
-            # Парсим JSON в Pydantic модель
-            commands = FanControlBatch(**response.json())
-            logger.info(f"✓ Получены команды для {len(commands.commands)} вентиляторов")
+            # Парсим и валидируем JSON за один проход в pydantic-core
+            commands = FanControlBatch.model_validate_json(response.content)
+            etag = response.headers.get('ETag')
+            if etag:
+                self._etag_cache[endpoint] = (etag, commands)
+            logger.info("✓ Получены команды для %d вентиляторов", len(commands.commands))
             return commands
             
         except requests.exceptions.ConnectionError:
-            logger.warning(f"Не удалось получить команды (сервер недоступен)")
+            logger.warning("Не удалось получить команды (сервер недоступен)")
             return None
             
         except Exception as e:
-            logger.warning(f"Ошибка получения команд: {e}")
+            logger.warning("Ошибка получения команд: %s", e)
             return None
     
     def health_check(self) -> bool:
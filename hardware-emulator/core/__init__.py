@@ -2,7 +2,8 @@
 Модуль ядра системы: физика и профили нагрузки
 """
 
-from core.physics_engine import GPUPhysicsEngine, RoomPhysicsEngine
+from core.physics_engine import GPUPhysicsBatch, GPUPhysicsEngine, RoomPhysicsEngine
+from core.random_pool import UniformPool
 from core.workload_profiles import (
     WorkloadType,
     MLWorkloadProfile,
@@ -13,8 +14,10 @@ from core.workload_profiles import (
 )
 
 __all__ = [
+    'GPUPhysicsBatch',
     'GPUPhysicsEngine',
     'RoomPhysicsEngine',
+    'UniformPool',
     'WorkloadType',
     'MLWorkloadProfile',
     'TrainingWorkloadProfile',
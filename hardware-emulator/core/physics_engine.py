@@ -3,24 +3,170 @@
 Отделен от датчиков - работает с истинными физическими значениями
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+import numpy as np
+
+from core.random_pool import SeedLike, shared_uniform_pool as _uniform_pool
+
+
+class GPUPhysicsBatch:
+    """
+    Физика всех GPU стойки в виде массивов NumPy (structure of arrays)
+    
+    Состояние GPU хранится в трёх массивах (temperature, workload,
+    target_temperature), а update() обновляет все GPU несколькими
+    векторными операциями вместо цикла по объектам.
+    GPUPhysicsEngine с batch= работает как view на один элемент.
+    """
+    
+    def __init__(self, gpu_count: int, config: Dict[str, Any], seed: Optional[SeedLike] = None):
+        """
+        Args:
+            gpu_count: Количество GPU
+            config: Конфигурация из config.yaml
+            seed: Seed генератора целевых температур (None = случайный)
+        """
+        gpu_temp_config = config['simulation']['gpu_temp']
+        self._idle_min = gpu_temp_config['idle_min']
+        self._idle_max = gpu_temp_config['idle_max']
+        self._load_min = gpu_temp_config['load_min']
+        self._load_max = gpu_temp_config['load_max']
+        self._heating_rate = gpu_temp_config['heating_rate']
+        self._cooling_rate = gpu_temp_config['cooling_rate']
+        self._rng = np.random.default_rng(seed)
+        
+        self.temperature = np.zeros(gpu_count)
+        self.workload = np.zeros(gpu_count)
+        self.target_temperature = np.zeros(gpu_count)
+    
+    def set_workloads(self, workloads: np.ndarray):
+        """
+        Устанавливает нагрузку всех GPU и пересчитывает целевые температуры
+        Та же модель, что и GPUPhysicsEngine.set_workload, но векторно
+        
+        Args:
+            workloads: Нагрузка каждой GPU от 0.0 (idle) до 1.0 (full)
+        """
+        workload = self.workload
+        np.clip(workloads, 0.0, 1.0, out=workload)
+        
+        n = len(workload)
+        idle_temp = self._rng.uniform(self._idle_min, self._idle_max, n)
+        load_temp = self._rng.uniform(self._load_min, self._load_max, n)
+        
+        # Практически idle (< 10%) — температура простоя, иначе линейная
+        # интерполяция между idle и load
+        self.target_temperature[:] = np.where(
+            workload < 0.1,
+            idle_temp,
+            self._idle_max + (load_temp - self._idle_max) * workload
+        )
+    
+    def update(self, dt: float, cooling_effects: np.ndarray, ambient_temp: float) -> np.ndarray:
+        """
+        Обновляет физическое состояние всех GPU за один шаг
+        Та же модель, что и GPUPhysicsEngine.update, но векторно
+        
+        Args:
+            dt: Временной интервал (секунды)
+            cooling_effects: Эффект охлаждения вентиляторов (0.0-1.0) для каждого GPU
+            ambient_temp: Температура окружающей среды (комнаты)
+        
+        Returns:
+            Массив новых истинных температур GPU
+        """
+        temp = self.temperature
+        target = self.target_temperature
+        min_temp = ambient_temp + 5.0  # GPU всегда теплее комнаты
+        
+        # 1. Естественное стремление к целевой температуре
+        # Нагрев до target, медленное естественное охлаждение
+        temp[:] = np.where(
+            temp < target,
+            np.minimum(temp + self._heating_rate * dt, target),
+            np.where(temp > target, temp - self._cooling_rate * dt * 0.3, temp)
+        )
+        
+        # 2. Дополнительное охлаждение от вентиляторов (только если GPU теплее комнаты)
+        temp_diff = np.maximum(temp - ambient_temp, 0.0)
+        temp -= self._cooling_rate * cooling_effects * dt * (temp_diff / 50.0)
+        
+        # 3. Физические ограничения
+        np.maximum(temp, min_temp, out=temp)
+        np.minimum(temp, 130.0, out=temp)  # Safety limit
+        
+        return temp
+    
+    def heat_contribution(self) -> float:
+        """
+        Суммарный вклад GPU в нагрев помещения
+        
+        Returns:
+            Сумма по GPU: 1.0 при нагрузке > 50%, 0.5 при > 20%, иначе 0.0
+        """
+        # (w > 0.5) + (w > 0.2) даёт 2/1/0 — без вложенного выбора
+        workload = self.workload
+        return 0.5 * float(np.count_nonzero(workload > 0.5) + np.count_nonzero(workload > 0.2))
+    
+    def step(self, dt: float, cooling_effects: np.ndarray, room: 'RoomPhysicsEngine') -> np.ndarray:
+        """
+        Один шаг физики стойки: помещение и все GPU
+        
+        Вклад GPU в нагрев считается по тем же массивам, что и update(),
+        так что симулятору достаточно одного вызова на тик
+        
+        Args:
+            dt: Временной интервал (секунды)
+            cooling_effects: Эффект охлаждения вентиляторов (0.0-1.0) для каждого GPU
+            room: Физика помещения (обновляется на этом же шаге)
+        
+        Returns:
+            Массив новых истинных температур GPU
+        """
+        room.update(self.heat_contribution())
+        return self.update(dt, cooling_effects, room.temperature)
 
 
 class GPUPhysicsEngine:
     """
     Моделирует физическое поведение GPU (нагрев/охлаждение)
     Не знает о датчиках - возвращает истинные физические значения
+    
+    Состояние хранится в GPUPhysicsBatch: либо в общем (batch стойки,
+    элемент index), либо в собственном batch из одного GPU
     """
     
-    def __init__(self, gpu_id: int, config: Dict[str, Any]):
+    __slots__ = ('gpu_id', 'config', '_batch', '_index',
+                 '_idle_min', '_idle_max', '_load_min', '_load_max',
+                 '_heating_rate', '_cooling_rate')
+    
+    def __init__(self, gpu_id: int, config: Dict[str, Any],
+                 batch: Optional[GPUPhysicsBatch] = None, index: int = 0):
         """
         Args:
             gpu_id: ID видеокарты
             config: Конфигурация из config.yaml
+            batch: Общий GPUPhysicsBatch (None = собственный на 1 GPU)
+            index: Индекс этого GPU в batch
         """
         self.gpu_id = gpu_id
         self.config = config
         
+        if batch is None:
+            batch = GPUPhysicsBatch(1, config)
+            index = 0
+        self._batch = batch
+        self._index = index
+        
+        # Параметры физики из конфига (читаем один раз, а не на каждом шаге)
+        gpu_temp_config = config['simulation']['gpu_temp']
+        self._idle_min = gpu_temp_config['idle_min']
+        self._idle_max = gpu_temp_config['idle_max']
+        self._load_min = gpu_temp_config['load_min']
+        self._load_max = gpu_temp_config['load_max']
+        self._heating_rate = gpu_temp_config['heating_rate']
+        self._cooling_rate = gpu_temp_config['cooling_rate']
+        
         # Текущее физическое состояние
         self.temperature = self._get_initial_temperature()
         self.workload = 0.0  # 0.0 = idle, 1.0 = full load
@@ -28,11 +174,7 @@ class GPUPhysicsEngine:
     
     def _get_initial_temperature(self) -> float:
         """Начальная температура GPU (idle)"""
-        import random
-        return random.uniform(
-            self.config['simulation']['gpu_temp']['idle_min'],
-            self.config['simulation']['gpu_temp']['idle_max']
-        )
+        return _uniform_pool.uniform(self._idle_min, self._idle_max)
     
     def set_workload(self, workload: float):
         """
@@ -53,19 +195,11 @@ class GPUPhysicsEngine:
         """
         if self.workload < 0.1:
             # Практически idle
-            import random
-            return random.uniform(
-                self.config['simulation']['gpu_temp']['idle_min'],
-                self.config['simulation']['gpu_temp']['idle_max']
-            )
+            return _uniform_pool.uniform(self._idle_min, self._idle_max)
         else:
             # Линейная интерполяция между idle и load
-            idle_temp = self.config['simulation']['gpu_temp']['idle_max']
-            import random
-            load_temp = random.uniform(
-                self.config['simulation']['gpu_temp']['load_min'],
-                self.config['simulation']['gpu_temp']['load_max']
-            )
+            idle_temp = self._idle_max
+            load_temp = _uniform_pool.uniform(self._load_min, self._load_max)
             return idle_temp + (load_temp - idle_temp) * self.workload
     
     def update(self, dt: float, cooling_effect: float, ambient_temp: float) -> float:
@@ -80,29 +214,30 @@ class GPUPhysicsEngine:
         Returns:
             Новая истинная температура GPU
         """
+        min_temp = ambient_temp + 5.0  # GPU всегда теплее комнаты
+        
         # 1. Естественное стремление к целевой температуре
         if self.temperature < self.target_temperature:
             # Нагрев
-            heating_rate = self.config['simulation']['gpu_temp']['heating_rate']
-            self.temperature += heating_rate * dt
-            self.temperature = min(self.temperature, self.target_temperature)
+            self.temperature += self._heating_rate * dt
+            if self.temperature > self.target_temperature:
+                self.temperature = self.target_temperature
         elif self.temperature > self.target_temperature:
             # Естественное охлаждение (медленное)
-            cooling_rate = self.config['simulation']['gpu_temp']['cooling_rate']
-            self.temperature -= cooling_rate * dt * 0.3
+            self.temperature -= self._cooling_rate * dt * 0.3
         
         # 2. Дополнительное охлаждение от вентилятора
         if cooling_effect > 0:
             temp_diff = self.temperature - ambient_temp
             if temp_diff > 0:
-                cooling_rate = self.config['simulation']['gpu_temp']['cooling_rate']
-                fan_cooling = cooling_rate * cooling_effect * dt * (temp_diff / 50.0)
+                fan_cooling = self._cooling_rate * cooling_effect * dt * (temp_diff / 50.0)
                 self.temperature -= fan_cooling
         
         # 3. Физические ограничения
-        min_temp = ambient_temp + 5.0  # GPU всегда теплее комнаты
-        self.temperature = max(self.temperature, min_temp)
-        self.temperature = min(self.temperature, 130.0)  # Safety limit
+        if self.temperature < min_temp:
+            self.temperature = min_temp
+        if self.temperature > 130.0:
+            self.temperature = 130.0  # Safety limit
         
         return self.temperature
     
@@ -113,6 +248,32 @@ class GPUPhysicsEngine:
     def get_workload(self) -> float:
         """Возвращает текущую нагрузку"""
         return self.workload
+    
+    # Состояние — элементы массивов GPUPhysicsBatch
+    
+    @property
+    def temperature(self) -> float:
+        return float(self._batch.temperature[self._index])
+    
+    @temperature.setter
+    def temperature(self, value: float):
+        self._batch.temperature[self._index] = value
+    
+    @property
+    def workload(self) -> float:
+        return float(self._batch.workload[self._index])
+    
+    @workload.setter
+    def workload(self, value: float):
+        self._batch.workload[self._index] = value
+    
+    @property
+    def target_temperature(self) -> float:
+        return float(self._batch.target_temperature[self._index])
+    
+    @target_temperature.setter
+    def target_temperature(self, value: float):
+        self._batch.target_temperature[self._index] = value
 
 
 class RoomPhysicsEngine:
@@ -124,6 +285,7 @@ class RoomPhysicsEngine:
         self.config = config
         self.temperature = config['simulation']['room_temp']['base']
         self.base_temp = config['simulation']['room_temp']['base']
+        self._variation = config['simulation']['room_temp']['variation']
     
     def update(self, gpu_heat_contribution: float):
         """
@@ -134,16 +296,18 @@ class RoomPhysicsEngine:
         """
         # Нагрев от GPU
         target_increase = gpu_heat_contribution * 0.25
-        variation = self.config['simulation']['room_temp']['variation']
-        target_temp = self.base_temp + min(target_increase, variation)
+        target_temp = self.base_temp + min(target_increase, self._variation)
+        
+        # Уже в равновесии (в пределах одного шага нагрева): не качаемся
+        # вокруг цели на ±0.02/0.05 °C
+        if abs(self.temperature - target_temp) < 0.02:
+            return
         
         # Инерционное изменение
         if self.temperature < target_temp:
             self.temperature += 0.02  # Медленный нагрев
         elif self.temperature > target_temp:
             self.temperature -= 0.05  # Быстрее остывание
-        
-        self.temperature = round(self.temperature, 1)
     
     def get_temperature(self) -> float:
         """Возвращает текущую температуру помещения"""
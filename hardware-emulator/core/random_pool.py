@@ -0,0 +1,143 @@
+"""
+Пул предгенерированных случайных чисел для горячих путей симуляции
+"""
+
+from typing import List, Optional, Union
+import numpy as np
+
+# Seed генератора: число или SeedSequence (например, дочерняя от spawn)
+SeedLike = Union[int, np.random.SeedSequence]
+
+
+def spawn_seeds(seed: Optional[SeedLike], count: int) -> List[Optional[np.random.SeedSequence]]:
+    """
+    Делит seed на count независимых дочерних seed
+    
+    Args:
+        seed: Исходный seed (None = все дочерние тоже случайные)
+        count: Количество дочерних seed
+    """
+    if seed is None:
+        return [None] * count
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    return seed.spawn(count)
+
+
+class UniformPool:
+    """
+    Равномерные случайные числа, сгенерированные пачкой
+    
+    Вместо вызова random.uniform на каждую GPU каждый тик числа
+    генерируются одной векторной операцией NumPy и выдаются по одному.
+    Когда пул исчерпан, он заполняется заново.
+    """
+    
+    def __init__(self, size: int = 4096, seed: Optional[SeedLike] = None):
+        """
+        Args:
+            size: Количество чисел в одной пачке
+            seed: Seed генератора (None = случайный)
+        """
+        self._rng = np.random.default_rng(seed)
+        self._size = size
+        self._refill()
+    
+    def reseed(self, seed: Optional[SeedLike]):
+        """
+        Пересоздаёт генератор с заданным seed и сбрасывает текущую пачку
+        
+        Args:
+            seed: Seed генератора (None = случайный)
+        """
+        self._rng = np.random.default_rng(seed)
+        self._refill()
+    
+    def _refill(self):
+        """Генерирует новую пачку чисел в [0, 1)"""
+        # list быстрее ndarray при поштучной выдаче Python float
+        self._pool = self._rng.random(self._size).tolist()
+        self._index = 0
+    
+    def uniform(self, low: float, high: float) -> float:
+        """Аналог random.uniform(low, high)"""
+        if self._index >= self._size:
+            self._refill()
+        value = self._pool[self._index]
+        self._index += 1
+        return low + (high - low) * value
+
+
+class NormalPool:
+    """
+    Стандартные нормальные N(0, 1) числа, сгенерированные пачкой
+    
+    Замена поштучного np.random.normal для шума датчиков: числа
+    генерируются одной векторной операцией и выдаются по одному,
+    масштаб (стандартное отклонение) задаёт вызывающий.
+    """
+    
+    def __init__(self, size: int = 4096, seed: Optional[SeedLike] = None):
+        """
+        Args:
+            size: Количество чисел в одной пачке
+            seed: Seed генератора (None = случайный)
+        """
+        self._rng = np.random.default_rng(seed)
+        self._size = size
+        self._refill()
+    
+    def reseed(self, seed: Optional[SeedLike]):
+        """
+        Пересоздаёт генератор с заданным seed и сбрасывает текущую пачку
+        
+        Args:
+            seed: Seed генератора (None = случайный)
+        """
+        self._rng = np.random.default_rng(seed)
+        self._refill()
+    
+    def _refill(self):
+        """Генерирует новую пачку чисел N(0, 1)"""
+        self._pool = self._rng.standard_normal(self._size).tolist()
+        self._index = 0
+    
+    def standard_normal(self) -> float:
+        """Аналог np.random.standard_normal() для одного числа"""
+        if self._index >= self._size:
+            self._refill()
+        value = self._pool[self._index]
+        self._index += 1
+        return value
+    
+    def standard_normal_batch(self, count: int) -> List[float]:
+        """
+        Следующие count чисел N(0, 1) одним срезом
+        
+        Args:
+            count: Количество чисел (не больше размера пачки)
+        """
+        if self._index + count > self._size:
+            self._refill()
+        values = self._pool[self._index:self._index + count]
+        self._index += count
+        return values
+
+
+# Общие пулы процесса: равномерные числа — для физики GPU (целевые
+# температуры) и оркестратора нагрузки, нормальные — для шума датчиков
+shared_uniform_pool = UniformPool()
+shared_normal_pool = NormalPool()
+
+
+def reseed_shared_pools(seed: Optional[SeedLike]):
+    """
+    Задаёт seed общим пулам: равномерному и пулу шума датчиков
+    
+    Args:
+        seed: Seed генератора (None = случайный); пулы получают
+            независимые дочерние seed
+    """
+    uniform_seed, normal_seed = spawn_seeds(seed, 2)
+    shared_uniform_pool.reseed(uniform_seed)
+    shared_normal_pool.reseed(normal_seed)
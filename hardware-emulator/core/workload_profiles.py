@@ -2,10 +2,12 @@
 Профили нагрузки для реалистичной симуляции ML задач в датацентре
 """
 
-import random
 import time
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from enum import Enum
+import numpy as np
+
+from core.random_pool import SeedLike, spawn_seeds, shared_uniform_pool as _uniform_pool
 
 
 class WorkloadType(Enum):
@@ -19,17 +21,43 @@ class WorkloadType(Enum):
 class MLWorkloadProfile:
     """
     Базовый класс для профилей ML нагрузки
+    
+    Подклассы реализуют get_workloads() — нагрузку сразу для группы GPU
+    (векторно, NumPy); get_workload() для одной GPU сводится к нему
     """
     
-    def __init__(self, config: Dict[str, Any]):
+    __slots__ = ('config', 'start_time', '_rng')
+    
+    def __init__(self, config: Dict[str, Any], seed: Optional[SeedLike] = None):
+        """
+        Args:
+            config: Конфигурация из config.yaml
+            seed: Seed генератора профиля для воспроизводимости (None = случайный)
+        """
         self.config = config
-        self.start_time = time.time()
+        # Собственный генератор (PCG64) у каждого профиля: без общего
+        # состояния между профилями, с возможностью повторить прогон
+        self._rng = np.random.default_rng(seed)
+        self.start_time = time.monotonic()  # для отсчёта фаз; не зависит от перевода системных часов
     
     def get_workload(self, gpu_id: int = 0) -> float:
         """
         Возвращает текущую нагрузку (0.0-1.0)
         gpu_id используется для десинхронизации профилей разных карт
         """
+        return float(self.get_workloads(np.array([gpu_id]))[0])
+    
+    def get_workloads(self, gpu_ids: np.ndarray, now: Optional[float] = None) -> np.ndarray:
+        """
+        Возвращает текущую нагрузку (0.0-1.0) для каждой GPU из gpu_ids
+        
+        Args:
+            gpu_ids: Массив ID видеокарт
+            now: Момент времени (time.monotonic()); None = текущий
+        
+        Returns:
+            Массив нагрузок той же длины
+        """
         raise NotImplementedError
 
 
@@ -43,44 +71,49 @@ class TrainingWorkloadProfile(MLWorkloadProfile):
     - Короткие периоды валидации
     """
     
+    # Фазы эпохи и диапазоны нагрузки в них (warmup — детерминированный разгон)
+    PHASE_WARMUP = 0
+    PHASE_VALIDATION = 1
+    PHASE_TRAINING = 2
+    _PHASE_LOW = np.array([0.0, 0.5, 0.85])
+    _PHASE_SPAN = np.array([0.0, 0.2, 0.15])
+    
+    __slots__ = ('epoch_duration', 'validation_interval', 'validation_duration', '_phase')
+    
     def __init__(self, config: Dict[str, Any], epoch_duration: int = 300, 
-                 validation_interval: int = 60):
-        super().__init__(config)
+                 validation_interval: int = 60, seed: Optional[SeedLike] = None):
+        super().__init__(config, seed)
         self.epoch_duration = epoch_duration  # секунды
         self.validation_interval = validation_interval
         self.validation_duration = 10  # секунды
         
-    def get_workload(self, gpu_id: int = 0) -> float:
+        # Таблица фаз эпохи с шагом в 1 секунду: фаза для cycle_time
+        # определяется одним индексированием вместо цепочки сравнений
+        # (границы фаз целочисленные, поэтому int(cycle_time) даёт ту же фазу)
+        seconds = np.arange(int(np.ceil(epoch_duration)))
+        self._phase = np.full(len(seconds), self.PHASE_TRAINING, dtype=np.uint8)
+        self._phase[seconds % validation_interval < self.validation_duration] = self.PHASE_VALIDATION
+        self._phase[seconds < 30] = self.PHASE_WARMUP
+    
+    def get_workloads(self, gpu_ids: np.ndarray, now: Optional[float] = None) -> np.ndarray:
         """Возвращает нагрузку в зависимости от фазы обучения"""
+        n = len(gpu_ids)
+        if now is None:
+            now = time.monotonic()
+        
         # Десинхронизация: сдвиг по времени для каждой GPU
         # Чтобы они не начинали эпохи одновременно
-        time_offset = gpu_id * 47.0 # Случайное смещение
+        time_offset = gpu_ids * 47.0
         
-        elapsed = time.time() - self.start_time + time_offset
+        elapsed = now - self.start_time + time_offset
         cycle_time = elapsed % self.epoch_duration
+        phase = self._phase[cycle_time.astype(np.intp)]
         
-        # Фаза warmup (первые 30 секунд эпохи)
-        if cycle_time < 30:
-            # Постепенное нарастание нагрузки
-            warmup_progress = cycle_time / 30.0
-            return 0.3 + (0.7 * warmup_progress)  # 30% → 100%
-        
-        # Проверяем, не время ли валидации
-        time_since_last_validation = cycle_time % self.validation_interval
-        if time_since_last_validation < self.validation_duration:
-            # Валидация: средняя нагрузка (с вариацией по GPU)
-            # Используем gpu_id как seed для "стабильного" рандома в этот момент времени
-            random.seed(int(elapsed) + gpu_id)
-            load = random.uniform(0.5, 0.7)
-            random.seed() # Reset seed
-            return load
-        
-        # Основное обучение: высокая стабильная нагрузка
-        # Тоже добавляем микро-вариации
-        random.seed(int(elapsed * 10) + gpu_id)
-        load = random.uniform(0.85, 1.0)
-        random.seed()
-        return load
+        # Валидация: средняя нагрузка (50-70%), обучение: высокая (85-100%)
+        load = self._PHASE_LOW[phase] + self._PHASE_SPAN[phase] * self._rng.random(n)
+        
+        # Фаза warmup (первые 30 секунд эпохи): нарастание 30% → 100%
+        return np.where(phase == self.PHASE_WARMUP, 0.3 + 0.7 * (cycle_time / 30.0), load)
 
 
 class InferenceWorkloadProfile(MLWorkloadProfile):
@@ -93,48 +126,37 @@ class InferenceWorkloadProfile(MLWorkloadProfile):
     - Небольшие вариации
     """
     
+    __slots__ = ('base_load', 'variation', 'last_spike_time', 'spike_duration')
+    
     def __init__(self, config: Dict[str, Any], base_load: float = 0.6,
-                 variation: float = 0.2):
-        super().__init__(config)
+                 variation: float = 0.2, seed: Optional[SeedLike] = None):
+        super().__init__(config, seed)
         self.base_load = base_load
         self.variation = variation
         self.last_spike_time = 0
         self.spike_duration = 15  # секунды
     
-    def get_workload(self, gpu_id: int = 0) -> float:
+    def get_workloads(self, gpu_ids: np.ndarray, now: Optional[float] = None) -> np.ndarray:
         """Возвращает нагрузку с периодическими пиками"""
-        current_time = time.time()
-        
-        # У каждой GPU свои пики
-        # Используем gpu_id для смещения времени проверки пиков
-        seed_offset = gpu_id * 1000
-        
-        # Чтобы пики были детерминированы по времени но случайны для GPU,
-        # можно использовать простую функцию от времени и ID
-        
-        # Простой вариант: сдвиг времени для каждого GPU для расчета "последнего пика"
-        # Но мы не храним состояние per-GPU в этом классе (он общий).
-        # Поэтому используем полностью stateless подход на основе времени
+        n = len(gpu_ids)
+        current_time = time.monotonic() if now is None else now
         
+        # У каждой GPU свои пики: профиль общий для группы и не хранит
+        # состояние per-GPU, поэтому фаза пика — функция времени и gpu_id.
         # Симулируем пик каждые 120 сек + смещение
         cycle_duration = 120.0
-        time_offset = gpu_id * 17.0
+        time_offset = gpu_ids * 17.0
         local_time = current_time + time_offset
         
-        cycle_pos = local_time % cycle_duration
+        spike = (local_time % cycle_duration) < self.spike_duration
         
-        if cycle_pos < self.spike_duration:
-             # Пик: высокая нагрузка
-             random.seed(int(current_time) + gpu_id)
-             load = random.uniform(0.85, 1.0)
-             random.seed()
-             return load
+        # Пик: высокая нагрузка (85-100%); обычная работа: стабильная
+        # средняя нагрузка base_load ± variation. Одна выборка на GPU,
+        # диапазон выбирается по маске пика
+        low = np.where(spike, 0.85, self.base_load - self.variation)
+        span = np.where(spike, 0.15, 2.0 * self.variation)
         
-        # Обычная работа: стабильная средняя нагрузка
-        random.seed(int(current_time * 10) + gpu_id)
-        load = self.base_load + random.uniform(-self.variation, self.variation)
-        random.seed()
-        return load
+        return low + span * self._rng.random(n)
 
 
 class IdleWorkloadProfile(MLWorkloadProfile):
@@ -143,17 +165,15 @@ class IdleWorkloadProfile(MLWorkloadProfile):
     Минимальная нагрузка с редкими всплесками
     """
     
-    def get_workload(self, gpu_id: int = 0) -> float:
+    __slots__ = ()
+    
+    def get_workloads(self, gpu_ids: np.ndarray, now: Optional[float] = None) -> np.ndarray:
         """Возвращает минимальную нагрузку"""
+        n = len(gpu_ids)
+        
         # 95% времени - простой, 5% - небольшая активность
-        # Используем gpu_id для уникальности
-        random.seed(int(time.time() * 10) + gpu_id)
-        if random.random() < 0.05:
-            load = random.uniform(0.2, 0.4)
-        else:
-            load = random.uniform(0.0, 0.1)
-        random.seed()
-        return load
+        activity = self._rng.random(n) < 0.05
+        return np.where(activity, self._rng.uniform(0.2, 0.4, n), self._rng.uniform(0.0, 0.1, n))
 
 
 class WorkloadOrchestrator:
@@ -162,9 +182,24 @@ class WorkloadOrchestrator:
     Обеспечивает корреляцию нагрузки внутри групп
     """
     
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], seed: Optional[SeedLike] = None):
+        """
+        Args:
+            config: Конфигурация из config.yaml
+            seed: Seed нагрузки (None = случайный); каждый профиль получает
+                свой независимый дочерний seed
+        """
         self.config = config
         self.groups: Dict[str, Dict[str, Any]] = {}
+        
+        # Seed профилей: idle, training, inference
+        self._profile_seeds = spawn_seeds(seed, 3)
+        
+        # gpu_id → профиль группы (O(1) поиск вместо перебора групп)
+        self._gpu_to_profile: Dict[int, MLWorkloadProfile] = {}
+        # Общий idle профиль для GPU вне групп
+        self._idle_profile = IdleWorkloadProfile(config, seed=self._profile_seeds[0])
+        
         self._setup_groups()
     
     def _setup_groups(self):
@@ -183,7 +218,8 @@ class WorkloadOrchestrator:
                 'profile': TrainingWorkloadProfile(
                     self.config,
                     epoch_duration=group_1.get('epoch_duration', 300),
-                    validation_interval=group_1.get('validation_interval', 60)
+                    validation_interval=group_1.get('validation_interval', 60),
+                    seed=self._profile_seeds[1]
                 )
             }
         
@@ -194,9 +230,15 @@ class WorkloadOrchestrator:
                 'gpus': group_2.get('gpus', []),
                 'profile': InferenceWorkloadProfile(
                     self.config,
-                    variation=group_2.get('load_variation', 0.2)
+                    variation=group_2.get('load_variation', 0.2),
+                    seed=self._profile_seeds[2]
                 )
             }
+        
+        # Первая группа, содержащая GPU, имеет приоритет
+        for group_data in self.groups.values():
+            for gpu_id in group_data['gpus']:
+                self._gpu_to_profile.setdefault(gpu_id, group_data['profile'])
     
     def get_workload_for_gpu(self, gpu_id: int) -> float:
         """
@@ -208,14 +250,37 @@ class WorkloadOrchestrator:
         Returns:
             Нагрузка от 0.0 до 1.0
         """
-        # Ищем, к какой группе принадлежит GPU
-        for group_name, group_data in self.groups.items():
-            if gpu_id in group_data['gpus']:
-                return group_data['profile'].get_workload(gpu_id)
-        
         # Если GPU не в группе, используем idle профиль
-        idle_profile = IdleWorkloadProfile(self.config)
-        return idle_profile.get_workload(gpu_id)
+        profile = self._gpu_to_profile.get(gpu_id, self._idle_profile)
+        return profile.get_workload(gpu_id)
+    
+    def get_workloads(self, gpu_ids: np.ndarray) -> np.ndarray:
+        """
+        Возвращает нагрузку сразу для набора GPU (по одному вызову профиля на группу)
+        
+        Args:
+            gpu_ids: Массив ID видеокарт
+        
+        Returns:
+            Массив нагрузок от 0.0 до 1.0 в порядке gpu_ids
+        """
+        # Один снимок времени на тик для всех групп
+        now = time.monotonic()
+        
+        workloads = np.empty(len(gpu_ids))
+        unassigned = np.ones(len(gpu_ids), dtype=bool)
+        
+        for group_data in self.groups.values():
+            mask = np.isin(gpu_ids, group_data['gpus']) & unassigned
+            if mask.any():
+                workloads[mask] = group_data['profile'].get_workloads(gpu_ids[mask], now)
+                unassigned &= ~mask
+        
+        # GPU вне групп — idle профиль
+        if unassigned.any():
+            workloads[unassigned] = self._idle_profile.get_workloads(gpu_ids[unassigned], now)
+        
+        return workloads
     
     def should_update_workload(self) -> bool:
         """
@@ -227,4 +292,4 @@ class WorkloadOrchestrator:
         
         # Старая логика: случайное изменение
         change_prob = self.config.get('workload', {}).get('change_probability', 0.3)
-        return random.random() < change_prob
+        return _uniform_pool.uniform(0.0, 1.0) < change_prob
@@ -3,14 +3,25 @@
 Отвечает за сбор данных с датчиков и отправку на Fog-сервер
 """
 
-from typing import List, Optional
-from datetime import datetime, timezone
+from typing import List, Optional, Tuple
 import logging
+import time
 
 from models import TelemetryPayload, SensorData, FanData, GPUTemperature, FanState, FanControlBatch
 from api_client import FogServerClient
 
 
+def _utc_timestamp() -> str:
+    """
+    Текущее время UTC в ISO 8601 (как datetime.now(timezone.utc).isoformat())
+    
+    Собирается из time.time_ns() через C-функции time.gmtime/strftime,
+    без создания объекта datetime
+    """
+    seconds, nanoseconds = divmod(time.time_ns(), 1_000_000_000)
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds)) + f".{nanoseconds // 1000:06d}+00:00"
+
+
 class ESP32Gateway:
     """
     Эмулятор ESP32 Edge Gateway
@@ -55,15 +66,24 @@ class ESP32Gateway:
         
         Returns:
             TelemetryPayload готовый к отправке
+        
+        Элементы списков уже провалидированы при создании (GPUTemperature,
+        FanState), поэтому обёртки собираются через model_construct без
+        повторной валидации; room_temp проверяется по ограничениям самой
+        модели SensorData (pydantic ValidationError — подкласс ValueError)
         """
-        payload = TelemetryPayload(
+        room_temperature = SensorData.model_validate(
+            {'gpu_temps': [], 'room_temp': room_temperature}
+        ).room_temp
+        
+        payload = TelemetryPayload.model_construct(
             device_id=self.device_id,
-            timestamp=datetime.now(timezone.utc).isoformat(),
-            sensors=SensorData(
+            timestamp=_utc_timestamp(),
+            sensors=SensorData.model_construct(
                 gpu_temps=gpu_temperatures,
                 room_temp=room_temperature
             ),
-            fans=FanData(fan_states=fan_states)
+            fans=FanData.model_construct(fan_states=fan_states)
         )
         
         return payload
@@ -78,7 +98,7 @@ class ESP32Gateway:
         Returns:
             True если успешно, False если ошибка
         """
-        self.logger.info(f"📤 ESP32 Gateway: Отправка телеметрии #{self.total_sends + 1}...")
+        self.logger.info("📤 ESP32 Gateway: Отправка телеметрии #%d...", self.total_sends + 1)
         
         success = self.api_client.send_telemetry(payload)
         
@@ -86,10 +106,34 @@ class ESP32Gateway:
             self.total_sends += 1
         else:
             self.failed_sends += 1
-            self.logger.warning(f"⚠ ESP32 Gateway: Ошибка отправки (всего неудач: {self.failed_sends})")
+            self.logger.warning("⚠ ESP32 Gateway: Ошибка отправки (всего неудач: %d)", self.failed_sends)
         
         return success
     
+    def exchange(self, payload: TelemetryPayload) -> Tuple[bool, Optional[FanControlBatch]]:
+        """
+        Отправляет телеметрию и получает команды за один HTTP-запрос
+        
+        Args:
+            payload: Пакет телеметрии
+        
+        Returns:
+            (True если отправка успешна, FanControlBatch если есть команды)
+        """
+        self.logger.info("📤 ESP32 Gateway: Отправка телеметрии #%d...", self.total_sends + 1)
+        
+        success, commands = self.api_client.send_tick(payload)
+        
+        if success:
+            self.total_sends += 1
+            if commands:
+                self.logger.info("📥 ESP32 Gateway: Получены команды (%d вентиляторов)", len(commands.commands))
+        else:
+            self.failed_sends += 1
+            self.logger.warning("⚠ ESP32 Gateway: Ошибка отправки (всего неудач: %d)", self.failed_sends)
+        
+        return success, commands
+    
     def receive_commands(self) -> Optional[FanControlBatch]:
         """
         Получает команды управления от fog-сервера
@@ -100,10 +144,19 @@ class ESP32Gateway:
         commands = self.api_client.fetch_fan_commands(self.device_id)
         
         if commands:
-            self.logger.info(f"📥 ESP32 Gateway: Получены команды ({len(commands.commands)} вентиляторов)")
+            self.logger.info("📥 ESP32 Gateway: Получены команды (%d вентиляторов)", len(commands.commands))
         
         return commands
     
+    def next_send_delay(self, base_interval: float) -> float:
+        """
+        Интервал до следующей отправки (растёт при недоступности fog-сервера)
+        
+        Args:
+            base_interval: Штатный интервал отправки (секунды)
+        """
+        return self.api_client.next_poll_delay(base_interval)
+    
     def health_check(self) -> bool:
         """
         Проверяет доступность fog-сервера
@@ -3,25 +3,44 @@
 Объединяет все компоненты: симуляторы, вентиляторы, HTTP-клиент
 """
 
+import math
 import time
 import yaml
 import logging
-from datetime import datetime, timezone
-from typing import List
+import queue
+import threading
+import numpy as np
+from typing import List, Optional, Tuple
 
-from models import TelemetryPayload, SensorData, FanData, GPUTemperature
+from models import TelemetryPayload, GPUTemperature, FanControlBatch
 from gpu_simulator import GPUSimulator, RoomSimulator
+from core.physics_engine import GPUPhysicsBatch
+from core.random_pool import reseed_shared_pools, spawn_seeds
 from actuators.fan_controller import FanController
 from edge_gateway.esp32_gateway import ESP32Gateway
 from core.workload_profiles import WorkloadOrchestrator
+from sensors.base_sensor import sensor_noise_pool
+from sensors.temperature_sensor import TemperatureSensorArray
 from logger_config import setup_logger
 
+# C-парсер libyaml, если PyYAML собран с ним; иначе чистый Python
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 logger = setup_logger(__name__, level=logging.INFO)
 
 
 class ESP32Emulator:
     """Главный класс эмулятора ESP32"""
     
+    # Строка состояния одной GPU в периодическом логе
+    _GPU_LOG_TEMPLATE = (
+        "  GPU {gpu_id}: {temp:.1f}°C [Нагрузка: {load:3.0f}%] | "
+        "Вентилятор: {rpm:4d} RPM (PWM: {pwm:3d}%)"
+    )
+    
     def __init__(self, config_path: str = "config.yaml"):
         """
         Args:
@@ -38,13 +57,31 @@ class ESP32Emulator:
         self.device_id = self.config['device']['id']
         self.gpu_count = self.config['device']['gpu_count']
         
-        # Создаём симуляторы GPU
+        # Seed случайных чисел (simulation.seed) делится на независимые
+        # дочерние: общие пулы (начальные температуры GPU, шум датчиков),
+        # целевые температуры физики и профили нагрузки. Пулы получают
+        # seed до создания симуляторов: начальные температуры берутся из пула
+        seed = self.config['simulation'].get('seed')
+        pool_seed, physics_seed, workload_seed = spawn_seeds(seed, 3)
+        if seed is not None:
+            reseed_shared_pools(pool_seed)
+            logger.info("  Seed случайных чисел: %s", seed)
+        
+        # Создаём симуляторы GPU (физика всех GPU — в общих массивах)
         logger.info(f"Создание {self.gpu_count} симуляторов GPU...")
+        self.gpu_physics = GPUPhysicsBatch(self.gpu_count, self.config, seed=physics_seed)
         self.gpus: List[GPUSimulator] = []
+        self.gpu_ids = np.arange(1, self.gpu_count + 1)
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
         for gpu_id in range(1, self.gpu_count + 1):
-            gpu = GPUSimulator(gpu_id, self.config)
+            gpu = GPUSimulator(gpu_id, self.config, self.gpu_physics, gpu_id - 1)
             self.gpus.append(gpu)
-            logger.debug(f"  GPU {gpu_id}: {gpu.temperature:.1f}°C (нагрузка {gpu.workload*100:.0f}%)")
+            if debug_enabled:
+                logger.debug(f"  GPU {gpu_id}: {gpu.temperature:.1f}°C (нагрузка {gpu.workload*100:.0f}%)")
+        
+        # Датчики температуры всех GPU: показания считаются одной векторной
+        # операцией по массиву температур физики
+        self.gpu_sensors = TemperatureSensorArray(self.gpu_ids, self.config)
         
         # Симулятор помещения
         logger.info("Создание симулятора помещения...")
@@ -53,7 +90,7 @@ class ESP32Emulator:
         
         # Оркестратор нагрузки (ML профили)
         logger.info("Инициализация WorkloadOrchestrator...")
-        self.workload_orchestrator = WorkloadOrchestrator(self.config)
+        self.workload_orchestrator = WorkloadOrchestrator(self.config, seed=workload_seed)
         if self.config.get('workload_profiles', {}).get('datacenter_ml', {}).get('enabled', False):
             logger.info("  ✓ ML профили активированы (datacenter mode)")
         else:
@@ -73,8 +110,16 @@ class ESP32Emulator:
         self.sensor_read_interval = self.config['timing']['sensor_read_interval']
         self.data_send_interval = self.config['timing']['data_send_interval']
         
-        # Буфер для накопления измерений
-        self.measurement_buffer = []
+        # Отправка в фоновом потоке (см. run): главный цикл кладёт пакет
+        # (с моментом начала отправки) в _send_queue, поток-отправитель
+        # возвращает команды через _command_queue — их применяет главный
+        # цикл, чтобы состояние вентиляторов менялось только в одном потоке.
+        # В полёте не больше одного пакета: срок следующей отправки
+        # (_next_send_time) выставляет отправитель, когда узнает результат,
+        # а до тех пор он бесконечен
+        self._send_queue: "queue.Queue[Tuple[TelemetryPayload, float]]" = queue.Queue(maxsize=1)
+        self._command_queue: "queue.Queue[FanControlBatch]" = queue.Queue()
+        self._next_send_time = math.inf
         
         # Счётчики для статистики
         self.total_readings = 0
@@ -88,7 +133,7 @@ class ESP32Emulator:
         """Загружает YAML конфигурацию"""
         try:
             with open(config_path, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
+                config = yaml.load(f, Loader=_YamlLoader)
             logger.info(f"✓ Конфигурация загружена из {config_path}")
             return config
         except FileNotFoundError:
@@ -105,29 +150,15 @@ class ESP32Emulator:
         """
         # 1. Обновляем нагрузку через WorkloadOrchestrator
         if self.workload_orchestrator.should_update_workload():
-            for i, gpu in enumerate(self.gpus):
-                gpu_id = i + 1
-                new_workload = self.workload_orchestrator.get_workload_for_gpu(gpu_id)
-                gpu.set_workload(new_workload)
-        
-        # 2. Вычисляем вклад GPU в нагрев помещения
-        gpu_heat_contribution = sum(
-            1.0 if gpu.workload > 0.5 else 0.5 if gpu.workload > 0.2 else 0.0
-            for gpu in self.gpus
-        )
+            workloads = self.workload_orchestrator.get_workloads(self.gpu_ids)
+            self.gpu_physics.set_workloads(workloads)
         
-        # 3. Обновляем температуру помещения
-        self.room.update(gpu_heat_contribution)
-        
-        # 4. Обновляем температуру каждого GPU
-        for i, gpu in enumerate(self.gpus):
-            fan_id = i + 1
-            fan_cooling = self.fan_controller.get_fan_cooling_effect(fan_id)
-            gpu.update_temperature(
-                dt=self.sensor_read_interval,
-                fan_cooling_effect=fan_cooling,
-                room_temp=self.room.temperature
-            )
+        # 2. Обновляем помещение и все GPU одним векторным шагом
+        self.gpu_physics.step(
+            dt=self.sensor_read_interval,
+            cooling_effects=self.fan_controller.get_cooling_effects(),
+            room=self.room.physics
+        )
         
         self.total_readings += 1
         
@@ -137,18 +168,29 @@ class ESP32Emulator:
     
     def _log_current_state(self):
         """Выводит текущее состояние системы в лог"""
+        # При уровне выше INFO не форматируем строки и не собираем массивы
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        
         logger.info("─" * 60)
-        logger.info(f"📊 Текущее состояние (чтение #{self.total_readings})")
-        logger.info(f"🏠 Помещение: {self.room.temperature:.1f}°C")
-        
-        for i, gpu in enumerate(self.gpus):
-            fan_id = i + 1
-            fan_state = self.fan_controller.fans[fan_id]
-            logger.info(
-                f"  GPU {gpu.gpu_id}: {gpu.temperature:.1f}°C "
-                f"[Нагрузка: {gpu.workload*100:3.0f}%] | "
-                f"Вентилятор: {fan_state['rpm']:4d} RPM (PWM: {fan_state['pwm']:3d}%)"
+        logger.info("📊 Текущее состояние (чтение #%d)", self.total_readings)
+        logger.info("🏠 Помещение: %.1f°C", self.room.temperature)
+        
+        # Все GPU одним сообщением: значения берём из массивов физики
+        # и контроллера вентиляторов, а не через объекты по одному
+        lines = [
+            self._GPU_LOG_TEMPLATE.format(
+                gpu_id=gpu_id, temp=temp, load=workload * 100, rpm=rpm, pwm=pwm
+            )
+            for gpu_id, temp, workload, rpm, pwm in zip(
+                self.gpu_ids.tolist(),
+                self.gpu_physics.temperature.tolist(),
+                self.gpu_physics.workload.tolist(),
+                self.fan_controller.rpm_array.tolist(),
+                self.fan_controller.pwm_array.tolist()
             )
+        ]
+        logger.info("\n".join(lines))
     
     def _create_telemetry_payload(self) -> TelemetryPayload:
         """
@@ -157,55 +199,91 @@ class ESP32Emulator:
         Returns:
             TelemetryPayload готовый к отправке на fog-сервер
         """
-        # Собираем температуры GPU
+        # Собираем температуры GPU; нагрузку в процентах считаем одной
+        # векторной операцией по массиву физики, а не через свойства
+        # каждого GPUSimulator
+        loads = np.round(self.gpu_physics.workload * 100, 1).tolist()
+        
+        # N(0, 1) для датчика каждой GPU и последнее — для помещения;
+        # масштаб шума (noise_std) задаёт сам датчик
+        noise = sensor_noise_pool.standard_normal_batch(self.gpu_count + 1)
+        
+        # Показания датчиков всех GPU одним вызовом
+        temperatures = self.gpu_sensors.read(
+            self.gpu_physics.temperature, np.asarray(noise[:-1])
+        ).tolist()
+        
         gpu_temps = [
-            GPUTemperature(
-                gpu_id=gpu.gpu_id,
-                temperature=gpu.get_temperature_with_noise(),
-                load=round(gpu.workload * 100, 1)
-            )
-            for gpu in self.gpus
+            GPUTemperature(gpu_id=gpu_id, temperature=temperature, load=load)
+            for gpu_id, temperature, load in zip(self.gpu_ids.tolist(), temperatures, loads)
         ]
         
         # Температура помещения
-        room_temp = self.room.get_temperature_with_noise()
+        room_temp = self.room.get_temperature_with_noise(noise[-1])
         
         # Состояния вентиляторов
         fan_states = self.fan_controller.get_all_fan_states()
         
-        # Формируем payload
-        payload = TelemetryPayload(
-            device_id=self.device_id,
-            timestamp=datetime.now(timezone.utc).isoformat(),
-            sensors=SensorData(
-                gpu_temps=gpu_temps,
-                room_temp=room_temp
-            ),
-            fans=FanData(fan_states=fan_states)
-        )
-        
-        return payload
+        # Формируем payload через Gateway (агрегация телеметрии — его задача)
+        return self.gateway.collect_telemetry(gpu_temps, room_temp, fan_states)
     
-    def _send_data(self):
+    def _send_payload(self, payload: TelemetryPayload) -> Optional[FanControlBatch]:
         """
-        Отправляет накопленные данные на fog-сервер через ESP32 Gateway
-        Вызывается каждые 30 секунд
-        """
-        payload = self._create_telemetry_payload()
+        Отправляет пакет через Gateway; команды управления приходят в том же ответе
         
-        # Отправляем через Gateway
-        success = self.gateway.send_telemetry(payload)
+        Returns:
+            FanControlBatch если сервер вернул команды, иначе None
+        """
+        success, commands = self.gateway.exchange(payload)
         
         if success:
             self.total_sends += 1
-            
-            # Пытаемся получить команды управления
-            commands = self.gateway.receive_commands()
-            if commands:
-                self._apply_fan_commands(commands)
         else:
             self.failed_sends += 1
-            logger.warning(f"⚠ Всего неудачных отправок: {self.failed_sends}")
+            logger.warning("⚠ Всего неудачных отправок: %d", self.failed_sends)
+        
+        return commands
+    
+    def _queue_send(self, send_time: float):
+        """
+        Передаёт пакет телеметрии фоновому отправителю
+        
+        Args:
+            send_time: Момент начала отправки (time.monotonic())
+        """
+        # Следующую отправку назначит отправитель после ответа сервера
+        self._next_send_time = math.inf
+        self._send_queue.put_nowait((self._create_telemetry_payload(), send_time))
+    
+    def _sender_loop(self):
+        """
+        Фоновый поток: отправляет пакеты из очереди, команды передаёт
+        главному циклу и назначает срок следующей отправки
+        """
+        while True:
+            payload, send_time = self._send_queue.get()
+            try:
+                commands = self._send_payload(payload)
+                if commands:
+                    self._command_queue.put(commands)
+            except Exception:
+                # Поток не должен умереть: иначе срок останется бесконечным
+                # и эмулятор перестанет отправлять данные
+                self.failed_sends += 1
+                logger.exception("✗ Ошибка при отправке телеметрии")
+            finally:
+                # Срок считаем один раз, уже зная результат этой отправки
+                # (при недоступности сервера Gateway увеличивает интервал)
+                self._next_send_time = send_time + self.gateway.next_send_delay(self.data_send_interval)
+    
+    def _apply_pending_commands(self):
+        """Применяет команды, полученные фоновым отправителем"""
+        while True:
+            try:
+                commands = self._command_queue.get_nowait()
+            except queue.Empty:
+                return
+            self._apply_fan_commands(commands)
     
     def _apply_fan_commands(self, commands):
         """
@@ -214,18 +292,24 @@ class ESP32Emulator:
         Args:
             commands: FanControlBatch с командами
         """
-        logger.info(f"🎛️  Применение команд управления...")
-        
-        for cmd in commands.commands:
-            old_pwm = self.fan_controller.fans[cmd.fan_id]["pwm"]
-            self.fan_controller.set_fan_pwm(cmd.fan_id, cmd.pwm_duty)
-            new_rpm = self.fan_controller.fans[cmd.fan_id]["rpm"]
-            
-            logger.info(
-                f"  Вентилятор {cmd.fan_id}: "
-                f"PWM {old_pwm}% → {cmd.pwm_duty}% "
-                f"({new_rpm} RPM)"
-            )
+        logger.info("🎛️  Применение команд управления...")
+        
+        fan_ids = np.fromiter((cmd.fan_id for cmd in commands.commands), dtype=np.int64)
+        pwm_duties = np.fromiter((cmd.pwm_duty for cmd in commands.commands), dtype=np.int64)
+        
+        # Сначала проверяем ID: иначе fan_id 0 прочитал бы последний
+        # вентилятор (индекс -1), а слишком большой дал бы IndexError
+        self.fan_controller.validate_fan_ids(fan_ids)
+        old_pwms = self.fan_controller.pwm_array[fan_ids - 1].tolist()
+        new_rpms = self.fan_controller.set_fan_pwm_batch(fan_ids, pwm_duties).tolist()
+        
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        
+        for fan_id, old_pwm, pwm_duty, new_rpm in zip(
+            fan_ids.tolist(), old_pwms, pwm_duties.tolist(), new_rpms
+        ):
+            logger.info("  Вентилятор %d: PWM %d%% → %d%% (%d RPM)", fan_id, old_pwm, pwm_duty, new_rpm)
     
     def run(self):
         """
@@ -246,21 +330,38 @@ class ESP32Emulator:
             logger.warning("⚠ Fog-сервер недоступен! Эмулятор будет работать, но данные не отправятся.")
             logger.warning("  Убедитесь что fog-сервер запущен на порту 8001")
         
-        last_send_time = time.time()
+        # Расписание по монотонным часам: следующее чтение отсчитывается
+        # от предыдущего запланированного, а не от конца итерации,
+        # поэтому время чтения и отправки не накапливает сдвиг
+        next_read_time = time.monotonic()
+        self._next_send_time = next_read_time + self.data_send_interval
+        
+        # HTTP-обмен идёт в отдельном потоке, чтобы медленный fog-сервер
+        # не сбивал период чтения датчиков
+        threading.Thread(target=self._sender_loop, name="telemetry-sender", daemon=True).start()
         
         try:
             while True:
+                # Команды от fog-сервера, пришедшие с прошлой итерации
+                self._apply_pending_commands()
+                
                 # Читаем датчики
                 self._read_sensors()
                 
                 # Проверяем, пора ли отправлять данные
-                current_time = time.time()
-                if current_time - last_send_time >= self.data_send_interval:
-                    self._send_data()
-                    last_send_time = current_time
+                current_time = time.monotonic()
+                if current_time >= self._next_send_time:
+                    self._queue_send(current_time)
                 
-                # Ждём до следующего чтения
-                time.sleep(self.sensor_read_interval)
+                # Ждём до следующего чтения (только остаток интервала)
+                next_read_time += self.sensor_read_interval
+                delay = next_read_time - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    # Отстали больше чем на интервал —
+                    # пропускаем упущенные чтения, а не догоняем пачкой
+                    next_read_time = time.monotonic()
                 
         except KeyboardInterrupt:
             logger.info("\n" + "=" * 60)
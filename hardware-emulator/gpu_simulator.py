@@ -3,8 +3,9 @@
 Использует отдельные компоненты: Physics Engine, Sensors, Workload Profiles
 """
 
-from typing import Dict, Any
-from core.physics_engine import GPUPhysicsEngine
+from typing import Dict, Any, Optional
+from core.physics_engine import GPUPhysicsBatch, GPUPhysicsEngine, RoomPhysicsEngine
+from sensors.base_sensor import sensor_noise_pool
 from sensors.temperature_sensor import TemperatureSensor
 
 
@@ -16,14 +17,27 @@ class GPUSimulator:
     - Physics Engine: моделирует истинную температуру
     - Temperature Sensor: добавляет шум при измерении
     - Workload: управляется извне через WorkloadOrchestrator
+    
+    Температура и нагрузка хранятся в массивах GPUPhysicsBatch, сам
+    объект — лишь представление своего элемента (без __dict__)
     """
     
-    def __init__(self, gpu_id: int, config: dict):
+    __slots__ = ('gpu_id', 'config', 'physics', 'temp_sensor')
+    
+    def __init__(self, gpu_id: int, config: dict,
+                 physics_batch: Optional[GPUPhysicsBatch] = None, index: int = 0):
+        """
+        Args:
+            gpu_id: ID видеокарты
+            config: Конфигурация из config.yaml
+            physics_batch: Общий GPUPhysicsBatch стойки (None = собственный)
+            index: Индекс GPU в physics_batch
+        """
         self.gpu_id = gpu_id
         self.config = config
         
         # Физический движок (истинное состояние)
-        self.physics = GPUPhysicsEngine(gpu_id, config)
+        self.physics = GPUPhysicsEngine(gpu_id, config, physics_batch, index)
         
         # Датчик температуры (измерение с шумом)
         self.temp_sensor = TemperatureSensor(gpu_id, config)
@@ -49,16 +63,20 @@ class GPUSimulator:
         """
         self.physics.update(dt, fan_cooling_effect, room_temp)
     
-    def get_temperature_with_noise(self) -> float:
+    def get_temperature_with_noise(self, noise_sample: Optional[float] = None) -> float:
         """
         Возвращает измеренную температуру (с шумом датчика)
         Это то, что "видит" ESP32
         
+        Args:
+            noise_sample: Заранее сгенерированное значение N(0, 1)
+                (None = датчик генерирует шум сам)
+        
         Returns:
             Температура с шумом датчика
         """
         true_temp = self.physics.get_temperature()
-        measured_temp = self.temp_sensor.read(true_temp)
+        measured_temp = self.temp_sensor.read(true_temp, noise_sample)
         return measured_temp
     
     def get_true_temperature(self) -> float:
@@ -85,7 +103,6 @@ class RoomSimulator:
     """
     
     def __init__(self, config: dict):
-        from core.physics_engine import RoomPhysicsEngine
         self.physics = RoomPhysicsEngine(config)
         self.config = config
     
@@ -93,12 +110,18 @@ class RoomSimulator:
         """Обновляет температуру помещения"""
         self.physics.update(gpu_heat_contribution)
     
-    def get_temperature_with_noise(self) -> float:
-        """Температура комнаты с небольшим шумом"""
-        import numpy as np
+    def get_temperature_with_noise(self, noise_sample: Optional[float] = None) -> float:
+        """
+        Температура комнаты с небольшим шумом
+        
+        Args:
+            noise_sample: Заранее сгенерированное значение N(0, 1)
+                (None = сгенерировать здесь)
+        """
         true_temp = self.physics.get_temperature()
-        noise = np.random.normal(0, 0.2)
-        return round(true_temp + noise, 1)
+        if noise_sample is None:
+            noise_sample = sensor_noise_pool.standard_normal()
+        return round(true_temp + 0.2 * noise_sample, 1)
     
     @property
     def temperature(self) -> float:
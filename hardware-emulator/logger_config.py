@@ -5,6 +5,7 @@
 
 import logging
 import sys
+from typing import Dict
 from colorama import Fore, Style, init
 
 # Инициализация colorama для Windows
@@ -23,15 +24,31 @@ class ColoredFormatter(logging.Formatter):
         'CRITICAL': Fore.RED + Style.BRIGHT,
     }
     
+    # Раскрашенные имена уровней собираются один раз, а не на каждую запись
+    _COLORED_LEVELS = {
+        levelname: f"{color}{levelname}{Style.RESET_ALL}"
+        for levelname, color in COLORS.items()
+    }
+    
     def format(self, record):
-        # Добавляем цвет к уровню лога
-        levelname = record.levelname
-        if levelname in self.COLORS:
-            record.levelname = f"{self.COLORS[levelname]}{levelname}{Style.RESET_ALL}"
+        # Добавляем цвет к уровню лога (уже раскрашенное имя не меняется)
+        record.levelname = self._COLORED_LEVELS.get(record.levelname, record.levelname)
         
         return super().format(record)
 
 
+# Формат: [2024-12-02 15:30:45] INFO: Сообщение
+# Один форматтер на все логгеры (он не хранит состояния между записями)
+_FORMATTER = ColoredFormatter(
+    fmt='[%(asctime)s] %(levelname)s: %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+
+# Уже настроенные логгеры по имени: повторный вызов не проходит через
+# logging.getLogger (глобальная блокировка модуля logging)
+_LOGGER_CACHE: Dict[str, logging.Logger] = {}
+
+
 def setup_logger(name: str, level: int = logging.INFO) -> logging.Logger:
     """
     Настраивает логгер с цветным выводом
@@ -43,8 +60,14 @@ def setup_logger(name: str, level: int = logging.INFO) -> logging.Logger:
     Returns:
         Настроенный logger
     """
+    cached = _LOGGER_CACHE.get(name)
+    if cached is not None:
+        cached.setLevel(level)
+        return cached
+    
     logger = logging.getLogger(name)
     logger.setLevel(level)
+    _LOGGER_CACHE[name] = logger
     
     # Проверяем, не добавлены ли уже handlers (избегаем дублирования)
     if logger.handlers:
@@ -54,13 +77,7 @@ def setup_logger(name: str, level: int = logging.INFO) -> logging.Logger:
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(level)
     
-    # Формат: [2024-12-02 15:30:45] INFO: Сообщение
-    formatter = ColoredFormatter(
-        fmt='[%(asctime)s] %(levelname)s: %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    
-    console_handler.setFormatter(formatter)
+    console_handler.setFormatter(_FORMATTER)
     logger.addHandler(console_handler)
     
     return logger
\ No newline at end of file
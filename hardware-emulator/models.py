@@ -4,7 +4,7 @@ Pydantic модели для валидации и сериализации JSON
 """
 
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 
 
@@ -103,4 +103,12 @@ class FanControlCommand(BaseModel):
 class FanControlBatch(BaseModel):
     """Пакет команд для нескольких вентиляторов"""
     device_id: str = Field(..., description="ID устройства")
-    commands: List[FanControlCommand] = Field(..., description="Список команд")
\ No newline at end of file
+    commands: List[FanControlCommand] = Field(..., description="Список команд")
+
+
+class TickResponse(BaseModel):
+    """
+    Ответ fog-сервера на /api/v1/tick
+    Команды для вентиляторов приходят в том же ответе (null если команд нет)
+    """
+    commands: Optional[FanControlBatch] = Field(None, description="Накопленные команды")
@@ -3,7 +3,7 @@
 """
 
 from sensors.base_sensor import BaseSensor
-from sensors.temperature_sensor import TemperatureSensor
+from sensors.temperature_sensor import TemperatureSensor, TemperatureSensorArray
 from sensors.sensor_registry import SensorRegistry
 
-__all__ = ['BaseSensor', 'TemperatureSensor', 'SensorRegistry']
+__all__ = ['BaseSensor', 'TemperatureSensor', 'TemperatureSensorArray', 'SensorRegistry']
@@ -4,8 +4,13 @@
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict
-import numpy as np
+from typing import Any, Dict, Optional
+
+from core.random_pool import shared_normal_pool
+
+# Общий для всех датчиков источник шума: один генератор на процесс
+# вместо глобального np.random (и своего генератора у каждого модуля)
+sensor_noise_pool = shared_normal_pool
 
 
 class BaseSensor(ABC):
@@ -14,8 +19,12 @@ class BaseSensor(ABC):
     
     Все датчики должны наследоваться от этого класса и реализовывать
     метод read() для получения измеренного значения
+    
+    Подклассы объявляют свои __slots__ (экземпляры без __dict__)
     """
     
+    __slots__ = ('sensor_id', 'config', '_last_reading')
+    
     def __init__(self, sensor_id: int, config: Dict[str, Any]):
         """
         Args:
@@ -43,16 +52,20 @@ class BaseSensor(ABC):
         """Возвращает последнее считанное значение"""
         return self._last_reading
     
-    def _add_noise(self, value: float, noise_std: float) -> float:
+    def _add_noise(self, value: float, noise_std: float,
+                   noise_sample: Optional[float] = None) -> float:
         """
         Добавляет гауссовский шум к значению
         
         Args:
             value: Исходное значение
             noise_std: Стандартное отклонение шума
+            noise_sample: Заранее сгенерированное значение N(0, 1)
+                (None = сгенерировать здесь)
         
         Returns:
             Значение с добавленным шумом
         """
-        noise = np.random.normal(0, noise_std)
-        return value + noise
+        if noise_sample is None:
+            noise_sample = sensor_noise_pool.standard_normal()
+        return value + noise_std * noise_sample
@@ -2,7 +2,7 @@
 Реестр датчиков для управления коллекцией датчиков
 """
 
-from typing import Dict, List, Type
+from typing import Any, Dict, List, Type
 from sensors.base_sensor import BaseSensor
 from sensors.temperature_sensor import TemperatureSensor
 
@@ -23,7 +23,16 @@ class SensorRegistry:
     
     def __init__(self, config: dict):
         self.config = config
-        self.sensors: Dict[str, List[BaseSensor]] = {}
+        # {тип датчика: {sensor_id: датчик}} — поиск по ID за O(1)
+        self.sensors: Dict[str, Dict[int, BaseSensor]] = {}
+        
+        # Параметры датчиков каждого типа извлекаются из конфига один раз
+        # и передаются в конструктор, а не ищутся заново для каждого датчика
+        self._sensor_params: Dict[str, Dict[str, Any]] = {
+            'temperature': {
+                'noise_std': config.get('simulation', {}).get('sensor_noise', 0.3)
+            },
+        }
     
     def register_sensor(self, sensor_type: str, sensor_id: int) -> BaseSensor:
         """
@@ -40,22 +49,18 @@ class SensorRegistry:
             raise ValueError(f"Неизвестный тип датчика: {sensor_type}")
         
         sensor_class = self.SENSOR_TYPES[sensor_type]
-        sensor = sensor_class(sensor_id, self.config)
-        
-        if sensor_type not in self.sensors:
-            self.sensors[sensor_type] = []
+        sensor = sensor_class(sensor_id, self.config, **self._sensor_params.get(sensor_type, {}))
         
-        self.sensors[sensor_type].append(sensor)
+        self.sensors.setdefault(sensor_type, {})[sensor_id] = sensor
         return sensor
     
     def get_sensors(self, sensor_type: str) -> List[BaseSensor]:
         """Возвращает все датчики указанного типа"""
-        return self.sensors.get(sensor_type, [])
+        return list(self.sensors.get(sensor_type, {}).values())
     
     def get_sensor(self, sensor_type: str, sensor_id: int) -> BaseSensor:
         """Возвращает конкретный датчик по типу и ID"""
-        sensors = self.get_sensors(sensor_type)
-        for sensor in sensors:
-            if sensor.sensor_id == sensor_id:
-                return sensor
-        raise ValueError(f"Датчик {sensor_type}#{sensor_id} не найден")
+        sensor = self.sensors.get(sensor_type, {}).get(sensor_id)
+        if sensor is None:
+            raise ValueError(f"Датчик {sensor_type}#{sensor_id} не найден")
+        return sensor
@@ -2,8 +2,9 @@
 Эмуляция датчика температуры DS18B20
 """
 
-from typing import Dict, Any
-from sensors.base_sensor import BaseSensor
+from typing import Dict, Any, Optional, Sequence
+import numpy as np
+from sensors.base_sensor import BaseSensor, sensor_noise_pool
 
 
 class TemperatureSensor(BaseSensor):
@@ -16,30 +17,102 @@ class TemperatureSensor(BaseSensor):
     - Время отклика: ~750ms
     """
     
-    def __init__(self, sensor_id: int, config: Dict[str, Any]):
+    __slots__ = ('noise_std', 'resolution', '_steps_per_unit')
+    
+    def __init__(self, sensor_id: int, config: Dict[str, Any],
+                 noise_std: Optional[float] = None):
+        """
+        Args:
+            sensor_id: ID датчика
+            config: Конфигурация из config.yaml
+            noise_std: СКО шума, уже извлечённое из конфига
+                (None = прочитать simulation.sensor_noise здесь)
+        """
         super().__init__(sensor_id, config)
         
         # Параметры датчика из конфига
-        self.noise_std = config.get('simulation', {}).get('sensor_noise', 0.3)
+        if noise_std is None:
+            noise_std = config.get('simulation', {}).get('sensor_noise', 0.3)
+        self.noise_std = noise_std
         self.resolution = 0.1  # Округление до 0.1°C для реализма
+        # Шагов разрешения на 1°C: округление через умножение, а не деление
+        self._steps_per_unit = 1.0 / self.resolution
     
-    def read(self, true_value: float) -> float:
+    def read(self, true_value: float, noise_sample: Optional[float] = None) -> float:
         """
         Читает температуру с учетом шума датчика
         
         Args:
             true_value: Истинная температура (из physics engine)
+            noise_sample: Заранее сгенерированное значение N(0, 1)
+                (None = сгенерировать при чтении)
         
         Returns:
             Измеренная температура с шумом и округлением
         """
         # Добавляем шум
-        noisy_value = self._add_noise(true_value, self.noise_std)
+        noisy_value = self._add_noise(true_value, self.noise_std, noise_sample)
         
-        # Округляем до разрешения датчика
-        measured_value = round(noisy_value / self.resolution) * self.resolution
+        # Округляем до разрешения датчика (деление на целое число шагов
+        # даёт ровно 61.8, а не 61.800000000000004 как умножение на 0.1)
+        measured_value = round(noisy_value * self._steps_per_unit) / self._steps_per_unit
         
         # Сохраняем последнее значение
         self._last_reading = measured_value
         
         return measured_value
+
+
+class TemperatureSensorArray:
+    """
+    Группа одинаковых датчиков DS18B20 (по одному на GPU) в массивах
+    
+    Те же шум и округление, что у TemperatureSensor, но показания всех
+    датчиков считаются одной векторной операцией над массивом истинных
+    температур (GPUPhysicsBatch.temperature), без объекта на датчик
+    """
+    
+    __slots__ = ('sensor_ids', 'noise_std', 'resolution', '_steps_per_unit', '_last_readings')
+    
+    def __init__(self, sensor_ids: Sequence[int], config: Dict[str, Any],
+                 noise_std: Optional[float] = None):
+        """
+        Args:
+            sensor_ids: ID датчиков (порядок совпадает с массивом температур)
+            config: Конфигурация из config.yaml
+            noise_std: СКО шума (None = simulation.sensor_noise из конфига)
+        """
+        self.sensor_ids = np.asarray(sensor_ids)
+        
+        if noise_std is None:
+            noise_std = config.get('simulation', {}).get('sensor_noise', 0.3)
+        self.noise_std = noise_std
+        self.resolution = 0.1
+        self._steps_per_unit = 1.0 / self.resolution
+        self._last_readings: Optional[np.ndarray] = None
+    
+    def read(self, true_values: np.ndarray,
+             noise_samples: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Читает температуры всех датчиков
+        
+        Args:
+            true_values: Истинные температуры (по одной на датчик)
+            noise_samples: Заранее сгенерированные значения N(0, 1)
+                (None = взять из общего пула шума)
+        
+        Returns:
+            Массив измеренных температур с шумом и округлением
+        """
+        if noise_samples is None:
+            noise_samples = np.asarray(sensor_noise_pool.standard_normal_batch(len(self.sensor_ids)))
+        
+        noisy_values = true_values + self.noise_std * noise_samples
+        measured = np.round(noisy_values * self._steps_per_unit) / self._steps_per_unit
+        
+        self._last_readings = measured
+        return measured
+    
+    def get_last_readings(self) -> Optional[np.ndarray]:
+        """Возвращает последние считанные значения"""
+        return self._last_readings